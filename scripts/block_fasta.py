@@ -0,0 +1,174 @@
+#! /usr/bin/env python
+# Block mode transcoding for scripts whose sequence edits are character-local
+# (e.g. `convert_rna_to_dna.py`, `degap_fasta.py`). Rather than building a
+# string per record, the input is read in multi-megabyte blocks. Sequence
+# regions go through a single `bytes.translate` and header lines are carried
+# through, or trimmed of their description. Each block is written out with a
+# single write. Blocks the fast path can not split exactly (e.g. indented
+# headers) are transcoded record by record instead. Output is the same as
+# that of the per-record code paths: one header line and one (unwrapped)
+# sequence line per record.
+
+import re
+from fasta_parsing import parse_header, iter_record_spans, sequence_string, \
+                          whitespace_bytes, missing_sequence_error, \
+                          blank_line_error, has_blank_line, blank_line_pattern
+
+default_block_size = 8 * 1024 * 1024
+
+# Splits a block, prefixed with a line break, into
+# [leading, (header, id, description, sequence lines)*], as
+# `fasta_parsing.parse_header` does for headers in which all whitespace is
+# ASCII whitespace (descriptions still need trailing whitespace stripped).
+# The line break ending each header is left at the start of its sequence
+# lines. The leading '\n>' lets `re` search for a literal prefix. Indented
+# headers are not matched, and end up in the sequence lines of the previous
+# record, where the '>' is caught after translation.
+header_pattern = re.compile(rb'\n(>(\S*)[^\S\n]*([^\n]*))')
+# bytes that are, or may be part of, whitespace for `str.split` and
+# `str.strip` but that `\s` does not match; headers containing them go
+# through `parse_header`, and sequences containing them through
+# `transcode_records`, as they are only stripped at line ends
+other_whitespace_bytes = bytes(range(0x1c, 0x20))
+
+
+def make_byte_trans_table(tt, upper=False):
+    """Convert a `str.maketrans` table into the (table, delete) arguments of
+    `bytes.translate`. Optionally upper-case characters before translating,
+    as in `str(seq).upper().translate(tt)`. Only ASCII is remapped."""
+    table = bytearray(range(256))
+    delete = bytearray()
+    for b in range(128):
+        c = chr(b)
+        if upper:
+            c = c.upper()
+        c = c.translate(tt)
+        if c == '':
+            delete.append(b)
+        elif len(c) == 1 and ord(c) < 128:
+            table[b] = ord(c)
+        else:
+            raise ValueError("Translation of %r can not be done on bytes!"
+                             % chr(b))
+    return bytes(table), bytes(delete)
+
+
+def has_other_whitespace(header):
+    return not header.isascii() or \
+           len(header.translate(None, other_whitespace_bytes)) != len(header)
+
+
+def transcode_records(block, table, delete, desc=False):
+    """Record by record version of `transcode_block`, following the rules
+    in `fasta_parsing` exactly. Used for the blocks that `transcode_block`
+    can not split and translate as a whole."""
+    out = []
+    for seq_id, description, start, end in iter_record_spans(block):
+        seq = sequence_string(block[start:end], seq_id)
+        if desc:
+            header = '>' + seq_id + ' ' + description + '\n'
+        else:
+            header = '>' + seq_id + '\n'
+        out.append(header.encode('utf-8'))
+        out.append(seq.encode('utf-8').translate(table, delete))
+        out.append(b'\n')
+    return b''.join(out)
+
+
+def transcode_block(block, table, block_table, delete, desc=False):
+    """Transcode a block made of a line break followed by whole FASTA
+    records. Returns the output records as bytes.
+
+    `block_table` is `table` with '>' as the translation of the bytes in
+    `other_whitespace_bytes`, so that sequences holding them are caught
+    along with those holding a '>'. Blocks with lone '\r' line breaks,
+    indented headers, or '>' or `other_whitespace_bytes` in sequence lines
+    go through `transcode_records`.
+    """
+    if b'\r' in block and block.count(b'\r') != block.count(b'\r\n'):
+        return transcode_records(block, table, delete, desc=desc)
+    pieces = header_pattern.split(block)
+    if pieces[0].strip():
+        # an indented first header, or a non-header line
+        return transcode_records(block, table, delete, desc=desc)
+    headers = pieces[1::4]
+    ids = pieces[2::4]
+    descriptions = pieces[3::4]
+    bodies = pieces[4::4]
+    n_seqs = len(headers)
+    if not n_seqs:
+        return b''
+
+    if has_other_whitespace(b''.join(headers)):
+        for i, header in enumerate(headers):
+            if has_other_whitespace(header):
+                seq_id, description = parse_header(header.decode('utf-8'))
+                ids[i] = seq_id.encode('utf-8')
+                descriptions[i] = description.encode('utf-8')
+
+    # translate all sequences at once, using '>' to keep them apart. Any
+    # other '>' left in a sequence makes the counts differ.
+    seqs = b'>'.join(bodies).translate(block_table, delete).split(b'>')
+    if len(seqs) != n_seqs:
+        return transcode_records(block, table, delete, desc=desc)
+
+    if b'' in seqs:
+        for seq_id, body in zip(ids, bodies):
+            if not body.strip():
+                raise missing_sequence_error(seq_id.decode('utf-8'))
+    if blank_line_pattern.search(block):
+        for seq_id, body in zip(ids, bodies):
+            if has_blank_line(body, 1, len(body)):
+                raise blank_line_error(seq_id.decode('utf-8'))
+
+    if desc:
+        descriptions = [description.rstrip() for description in descriptions]
+        out = [b'>', None, b' ', None, b'\n', None, b'\n'] * n_seqs
+        out[1::7] = ids
+        out[3::7] = descriptions
+        out[5::7] = seqs
+    else:
+        out = [b'>', None, b'\n', None, b'\n'] * n_seqs
+        out[1::5] = ids
+        out[3::5] = seqs
+    return b''.join(out)
+
+
+def transcode_fasta_blocks(fasta_ibfh, fasta_obfh, tt, upper=False,
+                           desc=False, block_size=default_block_size):
+    """Translate the sequences of binary FASTA handle `fasta_ibfh` with the
+    `str.maketrans` table `tt`, removing all whitespace and line breaks, and
+    write the records to binary handle `fasta_obfh`.
+
+    Blocks are cut before the last header they contain, so that each block
+    holds whole records. A record larger than `block_size` is read in over
+    several blocks before being processed.
+    """
+    table, delete = make_byte_trans_table(tt, upper=upper)
+    delete = bytes(set(delete) | set(whitespace_bytes))
+    if table[62] != 62 or 62 in delete or table.count(62) != 1:
+        raise ValueError("Translation can not change '>'!")
+    block_table = bytearray(table)
+    for b in other_whitespace_bytes:
+        if b not in delete:
+            block_table[b] = 62
+    block_table = bytes(block_table)
+    pending = [b'\n']
+    while True:
+        chunk = fasta_ibfh.read(block_size)
+        if chunk:
+            cut = chunk.rfind(b'\n>') + 1
+            if cut == 0 and not (chunk.startswith(b'>') and
+                                 pending[-1][-1] == ord('\n')):
+                pending.append(chunk) # no record boundary in this chunk
+                continue
+            chunk = memoryview(chunk)
+            pending.append(chunk[:cut])
+            block = b''.join(pending)
+            pending = [b'\n', chunk[cut:]]
+        else:
+            block = b''.join(pending)
+        fasta_obfh.write(transcode_block(block, table, block_table, delete,
+                                         desc=desc))
+        if not chunk:
+            break
@@ -10,9 +10,10 @@
 # ACCGGTTGGCCGTTCAGGGTACAGGTTGGCCGTTCAGGGTAA
 
 
-from skbio.io import read
 import string
 import argparse
+from fasta_checkpoint import FastaCheckpoint
+from block_fasta import transcode_fasta_blocks
 from argparse import RawTextHelpFormatter
 
 
@@ -43,6 +44,12 @@ def parse_seqs(fasta_ifh, fasta_ofh, convg=False, desc=False):
             fasta_ofh.write(new_str)
 
 
+def parse_seqs_blocks(fasta_ibfh, fasta_obfh, convg=False, desc=False):
+    """Block mode version of `parse_seqs`, on binary file handles."""
+    tt = make_trans_table(convg=convg)
+    transcode_fasta_blocks(fasta_ibfh, fasta_obfh, tt, desc=desc)
+
+
 def main():
     parser = argparse.ArgumentParser(
              description= 'This script will simply re-write FASTA files '
@@ -67,16 +74,51 @@ def main():
                       'description text.[Default: False]')
     optp.add_argument('-g', '--convert_to_gap', action='store_true',
                       help='Boolean. Convert "." to "-". [Default: False]')
+    optp.add_argument('-b', '--block_mode', action='store_true',
+                      help='Boolean. Process the input in large blocks '
+                      'rather than \nrecord by record. Faster, but can not '
+                      'be checkpointed. \n[Default: False]')
+    optp.add_argument('-k', '--checkpoint_interval', action='store',
+                      type=int, default=10000,
+                      help='Save a checkpoint, next to the output file, '
+                      'every n sequences. \nSet to 0 to disable. '
+                      "[Default %(default)s]")
+    optp.add_argument('--resume', action='store_true',
+                      help='Boolean. Resume an interrupted run from its last '
+                      'checkpoint. \n[Default: False]')
 
     p = parser.parse_args()
 
-    input_fasta = read(p.input_fasta, format='fasta')
-    output_fasta = open(p.output_fasta, 'w')
+    if p.block_mode:
+        if p.resume:
+            parser.error('--resume can not be used with --block_mode')
+        input_fasta = open(p.input_fasta, 'rb')
+        output_fasta = open(p.output_fasta, 'wb')
+    elif p.checkpoint_interval > 0:
+        options = {'convert_to_gap': p.convert_to_gap,
+                   'include_description': p.include_description}
+        checkpoint = FastaCheckpoint(p.input_fasta, p.output_fasta,
+                                     options=options,
+                                     interval=p.checkpoint_interval,
+                                     resume=p.resume)
+        input_fasta = checkpoint.reader
+        output_fasta = checkpoint.writer
+    elif p.resume:
+        parser.error('--resume requires a --checkpoint_interval > 0')
+    else:
+        # skbio is slow to import, and not needed by the other modes
+        from skbio.io import read
+        input_fasta = read(p.input_fasta, format='fasta')
+        output_fasta = open(p.output_fasta, 'w')
     convert_to_gap = p.convert_to_gap
     include_description = p.include_description
 
-    parse_seqs(input_fasta, output_fasta, convg=convert_to_gap,
-               desc=include_description)
+    if p.block_mode:
+        parse_seqs_blocks(input_fasta, output_fasta, convg=convert_to_gap,
+                          desc=include_description)
+    else:
+        parse_seqs(input_fasta, output_fasta, convg=convert_to_gap,
+                   desc=include_description)
 
     input_fasta.close()
     output_fasta.close()
@@ -10,9 +10,9 @@
 # ACCGGTTGGCCGTTCAGGGTACAGGTTGGCCGTTCAGGGTAA
 
 
-from skbio.io import read
 import string
 import argparse
+from block_fasta import transcode_fasta_blocks
 from argparse import RawTextHelpFormatter
 
 
@@ -41,6 +41,11 @@ def parse_seqs(fasta_ifh, fasta_ofh, convu=False, desc=False):
             new_str = '>' + seq.metadata['id'] + '\n' + seq_str + '\n'
             fasta_ofh.write(new_str)
 
+def parse_seqs_blocks(fasta_ibfh, fasta_obfh, convu=False, desc=False):
+    """Block mode version of `parse_seqs`, on binary file handles."""
+    tt = make_trans_table(convu=convu)
+    transcode_fasta_blocks(fasta_ibfh, fasta_obfh, tt, upper=True, desc=desc)
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -65,16 +70,29 @@ def main():
                       'description text.[Default: False]')
     optp.add_argument('-u', '--convert_to_uracil', action='store_true',
                       help='Boolean. Convert "U" to "T". [Default: False]')
+    optp.add_argument('-b', '--block_mode', action='store_true',
+                      help='Boolean. Process the input in large blocks '
+                      'rather than \nrecord by record. [Default: False]')
 
     p = parser.parse_args()
 
-    input_fasta = read(p.input_fasta, format='fasta')
-    output_fasta = open(p.output_fasta, 'w')
+    if p.block_mode:
+        input_fasta = open(p.input_fasta, 'rb')
+        output_fasta = open(p.output_fasta, 'wb')
+    else:
+        # skbio is slow to import, and not needed by the other modes
+        from skbio.io import read
+        input_fasta = read(p.input_fasta, format='fasta')
+        output_fasta = open(p.output_fasta, 'w')
     convert_to_uracil = p.convert_to_uracil
     include_description = p.include_description
 
-    parse_seqs(input_fasta, output_fasta, convu=convert_to_uracil,
-               desc=include_description)
+    if p.block_mode:
+        parse_seqs_blocks(input_fasta, output_fasta, convu=convert_to_uracil,
+                          desc=include_description)
+    else:
+        parse_seqs(input_fasta, output_fasta, convu=convert_to_uracil,
+                   desc=include_description)
 
     input_fasta.close()
     output_fasta.close()
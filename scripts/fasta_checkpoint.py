@@ -0,0 +1,229 @@
+#! /usr/bin/env python
+# Helpers to periodically checkpoint, and later resume, the streaming FASTA
+# scripts (e.g. `convert_rna_to_dna.py`, `remove_seqs_with_homopolymers.py`).
+# A checkpoint records the input byte offset of the next record to read, the
+# output byte offset after the last record written, and running counters.
+# Resuming truncates the output to the last checkpoint and continues reading
+# from the matching input offset, so the final output is identical to that of
+# an uninterrupted run.
+
+import json
+import os
+from fasta_parsing import parse_header, non_header_error, \
+                          missing_sequence_error, blank_line_error
+
+
+class FastaRecord:
+    """Minimal stand-in for the skbio sequence objects used by the scripts.
+    Exposes `metadata['id']`, `metadata['description']` and `str(seq)`."""
+
+    __slots__ = ('metadata', 'seq_str')
+
+    def __init__(self, seq_id, description, seq_str):
+        self.metadata = {'id': seq_id, 'description': description}
+        self.seq_str = seq_str
+
+    def __str__(self):
+        return self.seq_str
+
+    def __len__(self):
+        return len(self.seq_str)
+
+
+def iter_fasta_records(fasta_bfh, offset=0):
+    """Yield (FastaRecord, next_offset) from a binary FASTA file handle.
+
+    `offset` is the byte position `fasta_bfh` is currently at, and must be
+    the start of a header line (or of the file). `next_offset` is the byte
+    position at which the following record starts, i.e. where reading should
+    resume once the yielded record has been fully processed. Lines are
+    stripped and spaces are removed from the sequence data, following the
+    rules in `fasta_parsing`. Lines end at '\n' (or '\r\n'); unlike in
+    skbio, a lone '\r' does not end a line.
+    """
+    seq_id = None
+    description = ''
+    chunks = []
+    prev = None
+    for line in fasta_bfh:
+        line_start = offset
+        offset += len(line)
+        sline = line.decode('utf-8').strip()
+        if sline.startswith('>'):
+            if seq_id is not None:
+                if not chunks:
+                    raise missing_sequence_error(seq_id)
+                yield FastaRecord(seq_id, description, ''.join(chunks)), \
+                      line_start
+                chunks = []
+            seq_id, description = parse_header(sline)
+        elif sline:
+            if seq_id is None:
+                raise non_header_error(sline)
+            if not prev:
+                raise blank_line_error(seq_id)
+            chunks.append(sline.replace(' ', ''))
+        elif seq_id is None:
+            continue # skip blank lines at the beginning of the file
+        prev = sline
+    if seq_id is not None:
+        if not chunks:
+            raise missing_sequence_error(seq_id)
+        yield FastaRecord(seq_id, description, ''.join(chunks)), offset
+
+
+class FastaCheckpoint:
+    """Checkpoint state shared by a `CheckpointedFastaReader`, iterating over
+    the records of `input_fasta`, and a `CheckpointedFastaWriter`, writing to
+    `output_fasta`. A checkpoint is saved every `interval` records read.
+
+    `options` holds the run options that affect the output (e.g.
+    {'convert_to_gap': True}). They are stored in the checkpoint, along with
+    the size and modification time of the input, and resuming is refused if
+    any of them differ. The checkpoint is stored as JSON next to the output
+    file and removed once the whole input has been processed and the writer
+    is closed.
+    """
+
+    def __init__(self, input_fasta, output_fasta, options=None,
+                 interval=10000, resume=False, checkpoint_file=None):
+        if interval < 1:
+            raise ValueError("Checkpoint interval must be >= 1!")
+        self.input_fasta = input_fasta
+        self.output_fasta = output_fasta
+        self.options = dict(options or {})
+        self.interval = interval
+        if checkpoint_file is None:
+            checkpoint_file = output_fasta + '.ckpt'
+        self.checkpoint_file = checkpoint_file
+        input_stat = os.stat(input_fasta)
+        self.input_size = input_stat.st_size
+        self.input_mtime = input_stat.st_mtime_ns
+        self.input_offset = 0
+        self.output_offset = 0
+        self.seqs_read = 0
+        self.seqs_written = 0
+        self.finished = False
+
+        if resume:
+            if not os.path.exists(checkpoint_file):
+                # starting over would overwrite the output
+                raise ValueError("No checkpoint %s found! Can not resume. "
+                                 "Run without --resume to start from "
+                                 "scratch." % checkpoint_file)
+            self.load_checkpoint()
+            print('Resuming after %d sequences read, %d sequences written.'
+                  % (self.seqs_read, self.seqs_written))
+        self.writer = CheckpointedFastaWriter(self)
+        self.reader = CheckpointedFastaReader(self)
+
+    def load_checkpoint(self):
+        with open(self.checkpoint_file) as ckpt_fh:
+            ckpt = json.load(ckpt_fh)
+        if ckpt['input_size'] != self.input_size or \
+           ckpt.get('input_mtime') != self.input_mtime:
+            raise ValueError("Input file %s has changed since checkpoint %s "
+                             "was written! Can not resume."
+                             % (self.input_fasta, self.checkpoint_file))
+        if ckpt.get('options') != self.options:
+            raise ValueError("Options %s differ from those of checkpoint %s "
+                             "(%s)! Can not resume."
+                             % (self.options, self.checkpoint_file,
+                                ckpt.get('options')))
+        self.input_offset = ckpt['input_offset']
+        self.output_offset = ckpt['output_offset']
+        self.seqs_read = ckpt['seqs_read']
+        self.seqs_written = ckpt['seqs_written']
+
+    def save_checkpoint(self):
+        """Make the output durable up to the current position, then
+        atomically replace the checkpoint file."""
+        self.output_offset = self.writer.sync()
+        ckpt = {'input_fasta': self.input_fasta,
+                'input_size': self.input_size,
+                'input_mtime': self.input_mtime,
+                'options': self.options,
+                'input_offset': self.input_offset,
+                'output_offset': self.output_offset,
+                'seqs_read': self.seqs_read,
+                'seqs_written': self.seqs_written}
+        tmp_file = self.checkpoint_file + '.tmp'
+        with open(tmp_file, 'w') as tmp_fh:
+            json.dump(ckpt, tmp_fh)
+            tmp_fh.flush()
+            os.fsync(tmp_fh.fileno())
+        os.replace(tmp_file, self.checkpoint_file)
+
+    def remove_checkpoint(self):
+        if os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+
+
+class CheckpointedFastaReader:
+    """Iterates over `FastaRecord`s from the checkpointed input offset.
+
+    A record counts as written if the writer's output grew while the caller
+    was processing it, however many `write` calls that took.
+    """
+
+    def __init__(self, checkpoint):
+        self.checkpoint = checkpoint
+        self.input_fh = open(checkpoint.input_fasta, 'rb')
+        self.input_fh.seek(checkpoint.input_offset)
+
+    def __iter__(self):
+        ckpt = self.checkpoint
+        writer = ckpt.writer
+        records = iter_fasta_records(self.input_fh, offset=ckpt.input_offset)
+        for record, next_offset in records:
+            bytes_written = writer.bytes_written
+            yield record
+            # the caller has now written out everything for this record
+            ckpt.seqs_read += 1
+            if writer.bytes_written > bytes_written:
+                ckpt.seqs_written += 1
+            ckpt.input_offset = next_offset
+            if ckpt.seqs_read % ckpt.interval == 0:
+                ckpt.save_checkpoint()
+        ckpt.finished = True
+
+    def close(self):
+        self.input_fh.close()
+
+
+class CheckpointedFastaWriter:
+    """Text-style output handle that truncates the output to the checkpointed
+    offset when resuming."""
+
+    def __init__(self, checkpoint):
+        self.checkpoint = checkpoint
+        output_fasta = checkpoint.output_fasta
+        if checkpoint.output_offset > 0:
+            self.output_fh = open(output_fasta, 'r+b')
+            self.output_fh.seek(0, os.SEEK_END)
+            if self.output_fh.tell() < checkpoint.output_offset:
+                self.output_fh.close()
+                raise ValueError("Output file %s is shorter than its "
+                                 "checkpoint! Can not resume."
+                                 % output_fasta)
+            self.output_fh.truncate(checkpoint.output_offset)
+            self.output_fh.seek(checkpoint.output_offset)
+        else:
+            self.output_fh = open(output_fasta, 'wb')
+        self.bytes_written = checkpoint.output_offset
+
+    def write(self, fasta_str):
+        data = fasta_str.encode('utf-8')
+        self.output_fh.write(data)
+        self.bytes_written += len(data)
+
+    def sync(self):
+        """Flush the output to disk. Returns the output byte offset."""
+        self.output_fh.flush()
+        os.fsync(self.output_fh.fileno())
+        return self.bytes_written
+
+    def close(self):
+        self.output_fh.close()
+        if self.checkpoint.finished:
+            self.checkpoint.remove_checkpoint()
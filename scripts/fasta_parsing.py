@@ -0,0 +1,124 @@
+#! /usr/bin/env python
+# FASTA parsing rules shared by the FASTA readers in this directory. These
+# follow the skbio FASTA reader:
+#   - a header line is a line that starts with '>' once stripped of
+#     whitespace, so headers may be indented
+#   - blank lines are allowed before the first record, and after the
+#     sequence lines of a record, but not within them
+#   - every header must be followed by sequence data
+#   - the header is split into an ID and a description on the first
+#     whitespace
+# Each reader documents where it departs from these rules.
+
+import re
+import string
+
+whitespace_bytes = string.whitespace.encode('ascii')
+# a whitespace-only line, at the start of a span or after a line break
+leading_blank_line_pattern = re.compile(rb'[^\S\n]*\n')
+blank_line_pattern = re.compile(rb'\n[^\S\n]*\n')
+
+
+def parse_header(header_line):
+    """Split a FASTA header into (id, description), as skbio does."""
+    seq_id = ''
+    description = ''
+    header = header_line[1:].rstrip()
+    if header:
+        if header[0].isspace():
+            description = header.lstrip()
+        else:
+            header_tokens = header.split(None, 1)
+            if len(header_tokens) == 1:
+                seq_id = header_tokens[0]
+            else:
+                seq_id, description = header_tokens
+    return seq_id, description
+
+
+def find_header(buf, pos, end):
+    """Return the position of the '>' starting the first header line in
+    buf[pos:end], or -1 if there is none. `pos` must be the start of a line.
+    Line breaks may be '\n', '\r\n' or '\r'. Searches `buf` in place."""
+    line_start = pos
+    while True:
+        pos = buf.find(b'>', pos, end)
+        if pos == -1:
+            return -1
+        line_start = max(line_start, buf.rfind(b'\n', line_start, pos) + 1)
+        line_start = max(line_start, buf.rfind(b'\r', line_start, pos) + 1)
+        if pos == line_start or buf[line_start:pos].decode('utf-8').isspace():
+            return pos
+        pos += 1 # '>' within a sequence line
+
+
+def iter_record_spans(buf, start=0, end=None):
+    """Yield (id, description, body_start, body_end) for each record in
+    buf[start:end], where buf[body_start:body_end] holds the sequence lines
+    of the record. Only header lines are decoded. `buf` may be a bytes
+    object or an mmap."""
+    if end is None:
+        end = len(buf)
+    pos = find_header(buf, start, end)
+    leading = buf[start:end if pos == -1 else pos].decode('utf-8').strip()
+    if leading:
+        raise non_header_error(leading.splitlines()[0])
+    while pos != -1:
+        line_end = buf.find(b'\n', pos, end)
+        if line_end == -1:
+            line_end = end
+        # a lone '\r' also ends the header line
+        header_end = buf.find(b'\r', pos, line_end - 1)
+        if header_end == -1:
+            header_end = line_end
+        seq_id, description = parse_header(
+            buf[pos:header_end].decode('utf-8').strip())
+        body_start = header_end + 1
+        pos = find_header(buf, body_start, end)
+        yield seq_id, description, body_start, end if pos == -1 else pos
+
+
+def split_lines(text):
+    """Split text on '\n', '\r\n' and '\r' line breaks, as skbio does when
+    reading a file in text mode."""
+    return text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+
+
+def sequence_string(body, seq_id):
+    """Build the sequence string of record `seq_id` from the bytes of its
+    sequence lines. Lines are stripped and spaces are removed."""
+    seq_lines = [line.strip() for line in split_lines(body.decode('utf-8'))]
+    while seq_lines and not seq_lines[-1]:
+        seq_lines.pop()
+    if not seq_lines:
+        raise missing_sequence_error(seq_id)
+    if '' in seq_lines:
+        raise blank_line_error(seq_id)
+    return ''.join(seq_lines).replace(' ', '')
+
+
+def non_header_error(line):
+    return ValueError("Found non-header line when attempting to read the "
+                      "1st record:\n%s" % line)
+
+
+def missing_sequence_error(seq_id):
+    return ValueError("Found header without sequence data for %s!" % seq_id)
+
+
+def blank_line_error(seq_id):
+    return ValueError("Found blank or whitespace-only line within record "
+                      "%s!" % seq_id)
+
+
+def has_blank_line(buf, start, end):
+    """Return True if the sequence lines in buf[start:end] contain a blank or
+    whitespace-only line. Such lines at the end of the span are allowed.
+    `start` must be the start of a line. Searches `buf` in place, without
+    decoding or copying."""
+    while end > start and buf[end - 1] in whitespace_bytes:
+        end -= 1
+    if end <= start:
+        return False
+    return leading_blank_line_pattern.match(buf, start, end) is not None or \
+           blank_line_pattern.search(buf, start, end) is not None
@@ -5,7 +5,7 @@
 # only write those corresponding sequences in FASTA format.
 
 
-from skbio.io import read
+from lazy_fasta import LazyFastaReader
 import string
 import argparse
 from argparse import RawTextHelpFormatter
@@ -18,6 +18,8 @@ def parse_labels(labels_fh):
 
 
 def filter_seqs(fasta_ifh, fasta_ofh, seq_labels, remove_ids=False, desc=False):
+    """Keep or remove records by header ID. Only the sequences of records
+    that are written out are built, see `lazy_fasta.LazyFastaReader`."""
     # remove seqs and keep descriptors
     if remove_ids and desc:
         for seq in fasta_ifh:
@@ -82,7 +84,7 @@ def main():
 
     p = parser.parse_args()
 
-    input_fasta = read(p.input_fasta, format='fasta')
+    input_fasta = LazyFastaReader(p.input_fasta)
     input_labels = open(p.input_sequence_labels, 'U')
     output_fasta = open(p.output_fasta, 'w')
     remove_ids = p.remove_ids
@@ -9,7 +9,8 @@
 # sequences that are less than 1200 bases long. If the sequences is from
 # Archaea, then it will remove any sequence less than 900 bases long.
 
-from skbio.io import read
+from lazy_fasta import LazyFastaReader
+from taxonomy_store import TaxonomyStore, is_taxonomy_store
 from skbio import DNA
 import re
 import argparse
@@ -39,10 +40,10 @@ def make_taxonomy_dict(taxonomy_ifh):
 def filter_seqs_by_len_and_tax(fasta_ifh, fasta_ofh, taxonomic_groups_dict,
                               id_taxonomy_dict, global_length_min=1200):
     """Check if taxonomic group is present. Filter based on set sequence
-    for group. Perform some taxonomy sanity checking."""
+    for group. Perform some taxonomy sanity checking. Sequence lengths are
+    taken with `len(seq)`, so only the kept sequences are built as strings."""
     for seq in fasta_ifh:
         seq_id_str = seq.metadata['id']
-        seq_str = str(seq)
 
         try:
             #tax_list = id_taxonomy_dict[seq_id_str].strip().split(';')
@@ -56,16 +57,16 @@ def filter_seqs_by_len_and_tax(fasta_ifh, fasta_ofh, taxonomic_groups_dict,
         found_group = [i for i in tax_list if i in taxonomic_groups_dict]
         lg = len(found_group)
         if lg == 0: # if no group, use global minimum seq length
-            if len(seq_str) >= global_length_min:
-                fasta_str = '>' + seq_id_str + '\n' + seq_str + '\n'
+            if len(seq) >= global_length_min:
+                fasta_str = '>' + seq_id_str + '\n' + str(seq) + '\n'
                 fasta_ofh.write(fasta_str)
         elif lg > 1:
             print("More than one taxonomic group found in %s!" % seq_id_str )
             break
         else:
             gs = found_group[0]
-            if len(seq_str) >= taxonomic_groups_dict[gs]:
-                fasta_str = '>' + seq_id_str + '\n' + seq_str + '\n'
+            if len(seq) >= taxonomic_groups_dict[gs]:
+                fasta_str = '>' + seq_id_str + '\n' + str(seq) + '\n'
                 fasta_ofh.write(fasta_str)
 
 
@@ -85,7 +86,8 @@ def main():
     req.add_argument('-i', '--input_sequences', required=True, action='store',
                      help='Input fasta file.')
     req.add_argument('-t', '--input_taxonomy', required=True, action='store',
-                     help='Input taxonomy file.')
+                     help='Input taxonomy file, or indexed taxonomy store '
+                     '\nfrom parse_silva_taxonomy.py --output_store.')
     req.add_argument('-o', '--output_sequences', required=True, action='store',
                      help='Output filtered FASTA file.')
     optp = parser.add_argument_group('OPTIONAL')
@@ -106,13 +108,19 @@ def main():
 
     p = parser.parse_args()
 
-    input_sequences = read(p.input_sequences, format='fasta')
+    input_sequences = LazyFastaReader(p.input_sequences)
     output_sequences = open(p.output_sequences, 'w')
-    input_taxonomy = open(p.input_taxonomy, 'U')
     taxonomic_groups = p.taxonomic_groups
     global_length_min = p.global_length_min
 
-    id_taxonomy_dict = make_taxonomy_dict(input_taxonomy)
+    if is_taxonomy_store(p.input_taxonomy):
+        # every record is looked up, so load the whole taxonomy at once
+        taxonomy_store = TaxonomyStore(p.input_taxonomy)
+        id_taxonomy_dict = taxonomy_store.get_all_lineages()
+        taxonomy_store.close()
+    else:
+        input_taxonomy = open(p.input_taxonomy, 'U')
+        id_taxonomy_dict = make_taxonomy_dict(input_taxonomy)
     taxonomic_groups_dict = make_tax_group_dict(taxonomic_groups)
 
     filter_seqs_by_len_and_tax(input_sequences, output_sequences,
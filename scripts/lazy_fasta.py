@@ -0,0 +1,79 @@
+#! /usr/bin/env python
+# Header-first FASTA reader for scripts that decide whether to keep a record
+# from its header alone (e.g. `filter_fasta_by_seq_id.py`,
+# `filter_seqs_by_length_and_taxonomy.py`). The input is memory-mapped and
+# each record only parses its header line. The sequence is kept as a lazy
+# byte span, which is only decoded when `str(seq)` is called, so rejected
+# records are skipped by scanning straight to the next header line.
+
+import mmap
+from fasta_parsing import iter_record_spans, sequence_string, split_lines, \
+                          missing_sequence_error
+
+# `len(seq)` deletes the bytes that `str(seq)` always drops. Other
+# whitespace is only dropped at line ends, and non-ASCII characters take
+# several bytes, so these all map to '\t' to flag records that need their
+# lines decoded to be counted.
+len_delete_bytes = b' \r\n'
+len_flag_bytes = b'\t\x0b\x0c\x1c\x1d\x1e\x1f' + bytes(range(0x80, 0x100))
+len_table = bytes.maketrans(len_flag_bytes, b'\t' * len(len_flag_bytes))
+
+
+class LazyFastaRecord:
+    """Record exposing `metadata['id']` and `metadata['description']` up
+    front. `str(seq)` builds the sequence string, as the skbio reader would,
+    and `len(seq)` counts the sequence characters without building it."""
+
+    __slots__ = ('metadata', 'buf', 'start', 'end')
+
+    def __init__(self, seq_id, description, buf, start, end):
+        self.metadata = {'id': seq_id, 'description': description}
+        self.buf = buf
+        self.start = start
+        self.end = end
+
+    def body(self):
+        """Raw bytes of the sequence lines, including line breaks."""
+        return self.buf[self.start:self.end]
+
+    def __str__(self):
+        return sequence_string(self.body(), self.metadata['id'])
+
+    def __len__(self):
+        body = self.body()
+        seq = body.translate(len_table, len_delete_bytes)
+        if b'\t' in seq:
+            seq = ''.join(line.strip() for line in
+                          split_lines(body.decode('utf-8'))).replace(' ', '')
+        if not seq:
+            raise missing_sequence_error(self.metadata['id'])
+        return len(seq)
+
+
+class LazyFastaReader:
+    """Iterate over the records of a FASTA file as `LazyFastaRecord`s.
+
+    Only header lines are checked while iterating. The sequence lines of a
+    record are checked when `str(seq)` builds its sequence, which raises the
+    skbio errors for a blank line within the record or a missing sequence;
+    `len(seq)` only raises for a missing sequence. Records whose sequence is
+    never used are skipped without these checks, where the skbio reader
+    would reject the whole file.
+    """
+
+    def __init__(self, fasta_file):
+        self.fasta_fh = open(fasta_file, 'rb')
+        self.buf = b''
+        if self.fasta_fh.seek(0, 2) > 0:
+            self.buf = mmap.mmap(self.fasta_fh.fileno(), 0,
+                                 access=mmap.ACCESS_READ)
+
+    def __iter__(self):
+        buf = self.buf
+        for seq_id, description, start, end in iter_record_spans(buf):
+            yield LazyFastaRecord(seq_id, description, buf, start, end)
+
+    def close(self):
+        if isinstance(self.buf, mmap.mmap):
+            self.buf.close()
+        self.fasta_fh.close()
@@ -6,6 +6,7 @@
 from skbio.tree import TreeNode
 import re
 import argparse
+from taxonomy_store import write_taxonomy_store
 
 #allowed_ranks_list = [('domain','d__'), ('kingdom','k__'), ('phylum','p__'),
 #					  ('class','c__'), ('order','o__'), ('family','f__'),
@@ -136,23 +137,22 @@ def propagate_upper_taxonomy(sts_dict, rank_prefixes):
 		prop_tax_dict[tid] = '; '.join(prop_ranks)
 	return prop_tax_dict
 
+def iter_tax_strings(facc_species_tid_dict, prop_dict, sp_label=False):
+	"""Yields (FullAccession, TaxonomyID, lineage) for each taxmap record."""
+	for facc,taxinfo in facc_species_tid_dict.items():
+		tp = prop_dict[taxinfo[1]]
+		if sp_label:
+			species_name = taxinfo[0]
+			tp = tp + '; s__' + filter_characters(species_name)
+		yield facc, taxinfo[1], tp
+
 def write_tax_strings(facc_species_tid_dict, prop_dict, outfile,
 					  sp_label=False):
 		print('Saving new fixed-rank SILVA taxonomy to file...')
-		if sp_label:
-			for facc,taxinfo in facc_species_tid_dict.items():
-				tp = prop_dict[taxinfo[1]]
-				species_name = taxinfo[0]
-				clean_species_name = '; s__' + filter_characters(species_name)
-				nts = facc + '\t' + tp + clean_species_name + '\n'
-				#print(nts)
-				outfile.write(nts)
-		else:
-			for facc,taxinfo in facc_species_tid_dict.items():
-				tp = prop_dict[taxinfo[1]]
-				nts = facc + '\t' + tp  + '\n'
-				#print(nts)
-				outfile.write(nts)
+		for facc,tid,tp in iter_tax_strings(facc_species_tid_dict, prop_dict,
+											sp_label=sp_label):
+			nts = facc + '\t' + tp + '\n'
+			outfile.write(nts)
 
 
 def main():
@@ -173,6 +173,11 @@ def main():
 	                         'labels to the formatted taxonomy. WARNING: '
 	                         'Species labels may not be accurate! '
 							 '[Default: False]')
+	opt.add_argument('-d', '--output_store', action='store',
+	                 help='Also save the taxonomy as an indexed SQLite store. '
+	                      'Can be used in place of the output taxonomy by '
+	                      'filter_seqs_by_length_and_taxonomy.py, or opened '
+	                      'with taxonomy_store.TaxonomyStore.')
 
 	#parser.print_help()
 	#parser.parse_args([])
@@ -195,6 +200,11 @@ def main():
 	write_tax_strings(taxmap_dict, prop_dict, ouput_taxonomy, sp_label=sp_label)
 	ouput_taxonomy.close()
 
+	if p.output_store:
+		write_taxonomy_store(iter_tax_strings(taxmap_dict, prop_dict,
+											  sp_label=sp_label),
+							 prop_dict, p.output_store)
+
 
 
 if __name__ == '__main__':
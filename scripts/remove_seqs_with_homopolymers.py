@@ -9,6 +9,7 @@ from skbio.io import read
 from skbio import DNA
 import re
 import argparse
+from fasta_checkpoint import FastaCheckpoint
 from argparse import RawTextHelpFormatter
 
 def filter_seqs_with_ambiguous_bases(seq, n_ambiguous_bases):
@@ -72,11 +73,31 @@ def main():
                      default=5, help='Remove sequences that contain a '
                      'number of IUPAC ambiguous bases greater than or equal '
                      "to length n. \n[Default %(default)s)]")
+    optp.add_argument('-k', '--checkpoint_interval', action='store',
+                      type=int, default=10000,
+                      help='Save a checkpoint, next to the output file, '
+                      'every n sequences. \nSet to 0 to disable. '
+                      "[Default %(default)s]")
+    optp.add_argument('--resume', action='store_true',
+                      help='Boolean. Resume an interrupted run from its last '
+                      'checkpoint. \n[Default: False]')
 
     p = parser.parse_args()
 
-    input_fasta = read(p.input_fasta, format='fasta')
-    output_fasta = open(p.output_fasta, 'w')
+    if p.checkpoint_interval > 0:
+        options = {'n_homopolymer_length': p.n_homopolymer_length,
+                   'n_ambiguous_bases': p.n_ambiguous_bases}
+        checkpoint = FastaCheckpoint(p.input_fasta, p.output_fasta,
+                                     options=options,
+                                     interval=p.checkpoint_interval,
+                                     resume=p.resume)
+        input_fasta = checkpoint.reader
+        output_fasta = checkpoint.writer
+    elif p.resume:
+        parser.error('--resume requires a --checkpoint_interval > 0')
+    else:
+        input_fasta = read(p.input_fasta, format='fasta')
+        output_fasta = open(p.output_fasta, 'w')
     n_homopolymer_length = p.n_homopolymer_length
     n_ambiguous_bases = p.n_ambiguous_bases
 
@@ -0,0 +1,144 @@
+#! /usr/bin/env python
+# Indexed, on-disk version of the taxonomy written by `parse_silva_taxonomy.py`.
+# Rather than re-reading the whole taxonomy TSV into a dict on every run,
+# consumers can open the SQLite store in a few milliseconds and only page in
+# what they look up. This suits sparse lookups; scripts that need the lineage
+# of (nearly) every accession should load them all at once with
+# `TaxonomyStore.get_all_lineages`. The store maps:
+#   accession -> TaxID -> lineage
+# where each distinct lineage string is stored once (interned), e.g.:
+#   "A16379.1.1485" -> "3698" -> "d__Bacteria; p__Proteobacteria; ..."
+
+import os
+import sqlite3
+from urllib.request import pathname2url
+
+sqlite_magic = b'SQLite format 3\x00'
+
+
+def is_taxonomy_store(taxonomy_file):
+    """Return True if `taxonomy_file` is a SQLite store, rather than a TSV."""
+    with open(taxonomy_file, 'rb') as tax_fh:
+        return tax_fh.read(len(sqlite_magic)) == sqlite_magic
+
+
+def write_taxonomy_store(acc_taxid_lineages, prop_dict, store_file):
+    """Write a taxonomy store.
+
+    `acc_taxid_lineages` yields (FullAccession, TaxonomyID, lineage) where the
+    lineage is the string written to the taxonomy TSV. `prop_dict` is the
+    {TaxonomyID : lineage} dict from `propagate_upper_taxonomy`.
+    """
+    print('Saving indexed SILVA taxonomy store to file...')
+    tmp_file = store_file + '.tmp'
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+    conn = sqlite3.connect(tmp_file)
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute('CREATE TABLE lineages (lineage_id INTEGER PRIMARY KEY, '
+                 'lineage TEXT NOT NULL)')
+    conn.execute('CREATE TABLE taxids (taxid TEXT PRIMARY KEY, '
+                 'lineage_id INTEGER NOT NULL) WITHOUT ROWID')
+    conn.execute('CREATE TABLE accessions (accession TEXT PRIMARY KEY, '
+                 'taxid TEXT NOT NULL, lineage_id INTEGER NOT NULL) '
+                 'WITHOUT ROWID')
+
+    lineage_ids = {}
+    def intern_lineage(lineage):
+        try:
+            return lineage_ids[lineage]
+        except KeyError:
+            lineage_ids[lineage] = len(lineage_ids)
+            return lineage_ids[lineage]
+
+    taxid_rows = [(tid, intern_lineage(tp)) for tid, tp in prop_dict.items()]
+    acc_rows = [(facc, tid, intern_lineage(lineage))
+                for facc, tid, lineage in acc_taxid_lineages]
+
+    conn.executemany('INSERT INTO lineages VALUES (?, ?)',
+                     ((lid, lin) for lin, lid in lineage_ids.items()))
+    conn.executemany('INSERT INTO taxids VALUES (?, ?)', sorted(taxid_rows))
+    conn.executemany('INSERT INTO accessions VALUES (?, ?, ?)',
+                     sorted(acc_rows))
+    conn.commit()
+    conn.execute('VACUUM')
+    conn.close()
+    os.replace(tmp_file, store_file)
+    print('Number of accessions / distinct lineages in store: ',
+          len(acc_rows), '/', len(lineage_ids))
+
+
+class TaxonomyStore:
+    """Read-only lookups into a store written by `write_taxonomy_store`.
+
+    Supports `store[accession]` (raises KeyError) and `accession in store`,
+    so it can be used in place of the {accession : lineage} dict returned
+    by `filter_seqs_by_length_and_taxonomy.make_taxonomy_dict`. Each of
+    these runs one query, so they are meant for sparse lookups. For a pass
+    over most accessions, `get_all_lineages` is several times faster.
+    """
+
+    batch_size = 500
+
+    def __init__(self, store_file):
+        uri = 'file:%s?mode=ro' % pathname2url(os.path.abspath(store_file))
+        self.conn = sqlite3.connect(uri, uri=True)
+        self.conn.execute('PRAGMA mmap_size = 1073741824')
+
+    def get_lineage(self, accession, default=None):
+        row = self.conn.execute(
+            'SELECT l.lineage FROM accessions a JOIN lineages l '
+            'ON a.lineage_id = l.lineage_id WHERE a.accession = ?',
+            (accession,)).fetchone()
+        return default if row is None else row[0]
+
+    def get_taxid(self, accession, default=None):
+        row = self.conn.execute(
+            'SELECT taxid FROM accessions WHERE accession = ?',
+            (accession,)).fetchone()
+        return default if row is None else row[0]
+
+    def get_taxid_lineage(self, taxid, default=None):
+        """Lineage of a TaxID, without any species label."""
+        row = self.conn.execute(
+            'SELECT l.lineage FROM taxids t JOIN lineages l '
+            'ON t.lineage_id = l.lineage_id WHERE t.taxid = ?',
+            (taxid,)).fetchone()
+        return default if row is None else row[0]
+
+    def get_lineages(self, accessions):
+        """Returns the dict: {Accession : lineage} for the accessions found
+        in the store. Missing accessions are left out."""
+        accessions = list(accessions)
+        d = {}
+        for i in range(0, len(accessions), self.batch_size):
+            batch = accessions[i:i + self.batch_size]
+            query = ('SELECT a.accession, l.lineage FROM accessions a '
+                     'JOIN lineages l ON a.lineage_id = l.lineage_id '
+                     'WHERE a.accession IN (%s)'
+                     % ','.join('?' * len(batch)))
+            d.update(self.conn.execute(query, batch))
+        return d
+
+    def get_all_lineages(self):
+        """Returns the dict: {Accession : lineage} for every accession in the
+        store, read with one pass over each table. Accessions with the same
+        lineage share one lineage string."""
+        lineages = dict(self.conn.execute(
+            'SELECT lineage_id, lineage FROM lineages'))
+        return {accession: lineages[lineage_id] for accession, lineage_id in
+                self.conn.execute('SELECT accession, lineage_id '
+                                  'FROM accessions')}
+
+    def __getitem__(self, accession):
+        lineage = self.get_lineage(accession)
+        if lineage is None:
+            raise KeyError(accession)
+        return lineage
+
+    def __contains__(self, accession):
+        return self.get_taxid(accession) is not None
+
+    def close(self):
+        self.conn.close()
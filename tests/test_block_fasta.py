@@ -0,0 +1,104 @@
+# Check that block mode (`block_fasta.transcode_fasta_blocks`) writes the same
+# bytes as the record-by-record `parse_seqs` of the scripts that use it.
+
+import io
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('skbio')
+from skbio.io import read, FASTAFormatError
+
+scripts_dir = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'scripts')
+sys.path.insert(0, scripts_dir)
+
+import convert_rna_to_dna
+import degap_fasta
+from block_fasta import transcode_fasta_blocks
+
+fasta_data = {
+    'wrapped': b'>a first record\nACGU.acgu-\nAC..GU\n>b\nacgu\nAC\n'
+               b'>c  spaced   description \nAC GU\n  AC\n',
+    'crlf': b'>a first record\r\nACGU.acgu-\r\nACGU\r\n>b\r\nacgu\r\n\r\n'
+            b'>c\r\nAC\tGU\r\n',
+    'blank_lines': b'\n  \n>a first record\nACGU..GU\nACGU\n\n \n'
+                   b'>b\nacgu\n\n',
+    'indented_headers': b'  >a first record\nACGU.ACGU\n\t>b desc\nACGU\n'
+                        b'\x1c>c\nAC>GU\n',
+    'lone_cr': b'>a first record\rACGUACGU\rACGU\r>b\rAC\x0bGU\r',
+    'other_whitespace': b'>a\x1cx y\nAC\x1cGU\x1c\n>b \xc3\xa9 d\nACGU\n',
+}
+
+# (script module, keyword of its trans table option, upper-case first)
+scripts = [(convert_rna_to_dna, 'convg', False), (degap_fasta, 'convu', True)]
+
+
+def parse_seqs_output(module, fasta_file, option, desc):
+    fasta_ofh = io.StringIO()
+    module.parse_seqs(read(fasta_file, format='fasta'), fasta_ofh,
+                      desc=desc, **option)
+    return fasta_ofh.getvalue().encode('utf-8')
+
+
+def block_output(module, data, option, upper, desc, block_size):
+    fasta_obfh = io.BytesIO()
+    transcode_fasta_blocks(io.BytesIO(data), fasta_obfh,
+                           module.make_trans_table(**option), upper=upper,
+                           desc=desc, block_size=block_size)
+    return fasta_obfh.getvalue()
+
+
+@pytest.mark.parametrize('name', sorted(fasta_data))
+@pytest.mark.parametrize('module, option_name, upper', scripts)
+@pytest.mark.parametrize('option', [False, True])
+@pytest.mark.parametrize('desc', [False, True])
+def test_block_mode_matches_parse_seqs(tmp_path, name, module, option_name,
+                                       upper, option, desc):
+    data = fasta_data[name]
+    fasta_file = str(tmp_path / 'input.fasta')
+    with open(fasta_file, 'wb') as fasta_fh:
+        fasta_fh.write(data)
+    option = {option_name: option}
+    expected = parse_seqs_output(module, fasta_file, option, desc)
+    for block_size in list(range(1, len(data) + 2)) + [1 << 20]:
+        assert block_output(module, data, option, upper, desc,
+                            block_size) == expected, block_size
+
+
+@pytest.mark.parametrize('header', [b'>b', b'  >b'])
+def test_header_on_block_boundary(tmp_path, header):
+    data = b'>a desc\nACGU\n' + header + b' desc\nGGUU\n>c\nUU\n'
+    fasta_file = str(tmp_path / 'input.fasta')
+    with open(fasta_file, 'wb') as fasta_fh:
+        fasta_fh.write(data)
+    option = {'convg': False}
+    expected = parse_seqs_output(convert_rna_to_dna, fasta_file, option, True)
+    assert expected == b'>a desc\nACGT\n>b desc\nGGTT\n>c \nTT\n'
+    # blocks cut just before, at and just after the start of the header line
+    boundary = data.index(header)
+    for block_size in (boundary - 1, boundary, boundary + 1):
+        assert block_output(convert_rna_to_dna, data, option, False, True,
+                            block_size) == expected, block_size
+
+
+@pytest.mark.parametrize('data', [
+    b'>a\nACGU\n\nACGU\n>b\nACGU\n',
+    b'>a\nACGU\n \t\nACGU\n',
+    b'>a\r\nACGU\r\n\r\nACGU\r\n',
+    b'>a\nACGU\r\rACGU\n',
+    b'>a\n>b\nACGU\n',
+    b'>b\nACGU\n>a',
+    b'ACGU\n>a\nACGU\n',
+])
+@pytest.mark.parametrize('block_size', [1, 5, 1 << 20])
+def test_block_mode_rejects_what_skbio_rejects(tmp_path, data, block_size):
+    fasta_file = str(tmp_path / 'input.fasta')
+    with open(fasta_file, 'wb') as fasta_fh:
+        fasta_fh.write(data)
+    with pytest.raises(FASTAFormatError):
+        list(read(fasta_file, format='fasta'))
+    with pytest.raises(ValueError):
+        block_output(convert_rna_to_dna, data, {'convg': False}, False,
+                     False, block_size)
@@ -0,0 +1,109 @@
+# Kill the checkpointed FASTA scripts mid-stream, resume them, and check the
+# output is byte-identical to that of an uninterrupted run.
+
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+pytest.importorskip('skbio')
+
+scripts_dir = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'scripts')
+
+
+def write_fasta(fasta_file, alphabet, n_seqs, seed=42):
+    rng = random.Random(seed)
+    with open(fasta_file, 'w') as fasta_fh:
+        for i in range(n_seqs):
+            fasta_fh.write('>seq%d Some description %d\n' % (i, i))
+            seq = ''.join(rng.choice(alphabet)
+                          for _ in range(rng.randint(100, 400)))
+            for j in range(0, len(seq), 60):
+                fasta_fh.write(seq[j:j + 60] + '\n')
+
+
+def run_script(script, args):
+    return subprocess.run([sys.executable, os.path.join(scripts_dir, script)]
+                          + args, capture_output=True, text=True)
+
+
+def kill_after_checkpoint(script, args, checkpoint_file, timeout=120):
+    proc = subprocess.Popen([sys.executable,
+                             os.path.join(scripts_dir, script)] + args,
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL)
+    start = time.time()
+    while not os.path.exists(checkpoint_file):
+        if proc.poll() is not None:
+            pytest.fail('%s finished before a checkpoint was seen' % script)
+        if time.time() - start > timeout:
+            proc.kill()
+            pytest.fail('No checkpoint written by %s' % script)
+        time.sleep(0.01)
+    proc.send_signal(signal.SIGKILL)
+    proc.wait()
+
+
+@pytest.mark.parametrize('script, alphabet, n_seqs, options', [
+    ('convert_rna_to_dna.py', 'ACGUacgu..-', 100000, ['-g', '-d']),
+    ('remove_seqs_with_homopolymers.py', 'ACGTTTTTTTNRY', 20000,
+     ['-p', '9', '-a', '40']),
+])
+def test_resume_after_kill(tmp_path, script, alphabet, n_seqs, options):
+    input_fasta = str(tmp_path / 'input.fasta')
+    ref_fasta = str(tmp_path / 'ref.fasta')
+    out_fasta = str(tmp_path / 'out.fasta')
+    checkpoint_file = out_fasta + '.ckpt'
+    write_fasta(input_fasta, alphabet, n_seqs)
+
+    ref = run_script(script, ['-i', input_fasta, '-o', ref_fasta, '-k', '0']
+                     + options)
+    assert ref.returncode == 0, ref.stderr
+
+    args = ['-i', input_fasta, '-o', out_fasta, '-k', '50'] + options
+    kill_after_checkpoint(script, args, checkpoint_file)
+    assert os.path.exists(checkpoint_file)
+    assert os.path.getsize(out_fasta) < os.path.getsize(ref_fasta)
+
+    resumed = run_script(script, args + ['--resume'])
+    assert resumed.returncode == 0, resumed.stderr
+    assert 'Resuming after' in resumed.stdout
+    assert not os.path.exists(checkpoint_file)
+    with open(ref_fasta, 'rb') as ref_fh, open(out_fasta, 'rb') as out_fh:
+        assert ref_fh.read() == out_fh.read()
+
+
+def test_resume_refuses_changed_options(tmp_path):
+    input_fasta = str(tmp_path / 'input.fasta')
+    out_fasta = str(tmp_path / 'out.fasta')
+    write_fasta(input_fasta, 'ACGUacgu..-', 100000)
+
+    args = ['-i', input_fasta, '-o', out_fasta, '-k', '50']
+    kill_after_checkpoint('convert_rna_to_dna.py', args + ['-g'],
+                          out_fasta + '.ckpt')
+    resumed = run_script('convert_rna_to_dna.py', args + ['--resume'])
+    assert resumed.returncode != 0
+    assert 'Can not resume' in resumed.stderr
+
+
+def test_resume_refuses_missing_checkpoint(tmp_path):
+    input_fasta = str(tmp_path / 'input.fasta')
+    out_fasta = str(tmp_path / 'out.fasta')
+    write_fasta(input_fasta, 'ACGU', 10)
+
+    args = ['-i', input_fasta, '-o', out_fasta]
+    done = run_script('convert_rna_to_dna.py', args)
+    assert done.returncode == 0, done.stderr
+    with open(out_fasta, 'rb') as out_fh:
+        output = out_fh.read()
+
+    resumed = run_script('convert_rna_to_dna.py', args + ['--resume'])
+    assert resumed.returncode != 0
+    assert 'No checkpoint' in resumed.stderr
+    with open(out_fasta, 'rb') as out_fh:
+        assert out_fh.read() == output
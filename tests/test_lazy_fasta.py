@@ -0,0 +1,138 @@
+# Check that the filters give the same output with `LazyFastaReader` as with
+# the skbio FASTA reader they replaced.
+
+import io
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('skbio')
+from skbio.io import read, FASTAFormatError
+
+scripts_dir = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'scripts')
+sys.path.insert(0, scripts_dir)
+
+from lazy_fasta import LazyFastaReader
+from filter_fasta_by_seq_id import filter_seqs
+from filter_seqs_by_length_and_taxonomy import filter_seqs_by_len_and_tax
+
+fasta_data = {
+    'wrapped': b'>a first record\nACGUACGU\nACGU\n>b\nacgu\nAC\n'
+               b'>c  spaced   description \nAC GU\n  AC\n',
+    'crlf': b'>a first record\r\nACGUACGU\r\nACGU\r\n>b\r\nacgu\r\n\r\n'
+            b'>c\r\nAC\tGU\r\n',
+    'blank_lines': b'\n  \n>a first record\nACGUACGU\nACGU\n\n \n'
+                   b'>b\nacgu\n\n',
+    'indented_headers': b'  >a first record\nACGUACGU\n\t>b desc\nACGU\n'
+                        b'\x1c>c\nAC>GU\n',
+    'lone_cr': b'>a first record\rACGUACGU\rACGU\r>b\rAC\x0bGU\r',
+    'tabs': b'>a\nAC\tGU\n\tAC\t\n>b\nACGUACGUA\n>c\nAC\x1cGU\x1c\n',
+}
+
+taxonomy = {'a': 'd__Bacteria; p__A', 'b': 'd__Archaea; p__B',
+            'c': 'd__Bacteria; p__C'}
+
+
+def write_fasta(tmp_path, data):
+    fasta_file = str(tmp_path / 'input.fasta')
+    with open(fasta_file, 'wb') as fasta_fh:
+        fasta_fh.write(data)
+    return fasta_file
+
+
+def filter_output(filter_func, fasta_file, *args, lazy=True, **kwargs):
+    if lazy:
+        fasta_ifh = LazyFastaReader(fasta_file)
+    else:
+        fasta_ifh = read(fasta_file, format='fasta')
+    fasta_ofh = io.StringIO()
+    filter_func(fasta_ifh, fasta_ofh, *args, **kwargs)
+    if lazy:
+        fasta_ifh.close()
+    return fasta_ofh.getvalue()
+
+
+@pytest.mark.parametrize('name', sorted(fasta_data))
+def test_records_match_skbio(tmp_path, name):
+    fasta_file = write_fasta(tmp_path, fasta_data[name])
+    expected = [(seq.metadata['id'], seq.metadata['description'], str(seq))
+                for seq in read(fasta_file, format='fasta')]
+    reader = LazyFastaReader(fasta_file)
+    records = list(reader)
+    assert [(seq.metadata['id'], seq.metadata['description'], str(seq))
+            for seq in records] == expected
+    assert [len(seq) for seq in records] == [len(seq_str) for _, _, seq_str
+                                             in expected]
+    reader.close()
+
+
+@pytest.mark.parametrize('name', sorted(fasta_data))
+@pytest.mark.parametrize('remove_ids', [False, True])
+@pytest.mark.parametrize('desc', [False, True])
+def test_filter_seqs_matches_skbio(tmp_path, name, remove_ids, desc):
+    fasta_file = write_fasta(tmp_path, fasta_data[name])
+    args = ({'a', 'c'},)
+    kwargs = {'remove_ids': remove_ids, 'desc': desc}
+    assert filter_output(filter_seqs, fasta_file, *args, **kwargs) == \
+           filter_output(filter_seqs, fasta_file, *args, lazy=False, **kwargs)
+
+
+@pytest.mark.parametrize('name', sorted(fasta_data))
+@pytest.mark.parametrize('length_min', [4, 8, 9, 12])
+def test_filter_seqs_by_len_and_tax_matches_skbio(tmp_path, name,
+                                                  length_min):
+    fasta_file = write_fasta(tmp_path, fasta_data[name])
+    args = ({'d__Bacteria': length_min}, taxonomy)
+    kwargs = {'global_length_min': length_min - 1}
+    assert filter_output(filter_seqs_by_len_and_tax, fasta_file, *args,
+                         **kwargs) == \
+           filter_output(filter_seqs_by_len_and_tax, fasta_file, *args,
+                         lazy=False, **kwargs)
+
+
+@pytest.mark.parametrize('data', [
+    b'>a\nACGU\n\nACGU\n>b\nACGU\n',
+    b'>a\nACGU\n \t\nACGU\n',
+    b'>a\r\nACGU\r\n\r\nACGU\r\n',
+    b'>a\nACGU\r\rACGU\n',
+    b'>a\n\nACGU\n',
+])
+def test_blank_line_within_record(tmp_path, data):
+    fasta_file = write_fasta(tmp_path, data)
+    with pytest.raises(FASTAFormatError):
+        list(read(fasta_file, format='fasta'))
+    reader = LazyFastaReader(fasta_file)
+    seq = next(iter(reader))
+    with pytest.raises(ValueError, match='blank or whitespace-only line'):
+        str(seq)
+    reader.close()
+
+
+@pytest.mark.parametrize('data', [b'>a\n>b\nACGU\n', b'>a\n \n>b\nACGU\n',
+                                  b'>b\nACGU\n>a'])
+def test_missing_sequence(tmp_path, data):
+    fasta_file = write_fasta(tmp_path, data)
+    with pytest.raises(FASTAFormatError):
+        list(read(fasta_file, format='fasta'))
+    reader = LazyFastaReader(fasta_file)
+    seq = [seq for seq in reader if seq.metadata['id'] == 'a'][0]
+    with pytest.raises(ValueError, match='without sequence data for a'):
+        str(seq)
+    with pytest.raises(ValueError, match='without sequence data for a'):
+        len(seq)
+    reader.close()
+
+
+def test_non_header_first_line(tmp_path):
+    fasta_file = write_fasta(tmp_path, b'\nACGU\n>a\nACGU\n')
+    with pytest.raises(ValueError, match='non-header line'):
+        list(LazyFastaReader(fasta_file))
+
+
+def test_rejected_records_are_not_checked(tmp_path):
+    # documented difference from skbio: only built sequences are checked
+    fasta_file = write_fasta(tmp_path, b'>a\nACGU\n\nACGU\n>b\nACGU\n')
+    output = filter_output(filter_seqs, fasta_file, {'b'})
+    assert output == '>b\nACGU\n'
@@ -0,0 +1,105 @@
+# Write a taxonomy as both a TSV and an indexed store, and check that the
+# store answers every lookup the same way as the dict read from the TSV.
+
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('skbio')
+
+scripts_dir = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'scripts')
+sys.path.insert(0, scripts_dir)
+
+from parse_silva_taxonomy import iter_tax_strings, write_tax_strings
+from taxonomy_store import TaxonomyStore, is_taxonomy_store, \
+                           write_taxonomy_store
+from filter_seqs_by_length_and_taxonomy import make_taxonomy_dict, \
+                                               filter_seqs_by_len_and_tax
+from lazy_fasta import LazyFastaReader
+
+prop_dict = {
+    '3': 'd__Bacteria; p__Proteobacteria; c__Gammaproteobacteria',
+    '7': 'd__Archaea; p__Crenarchaeota; c__Thermoprotei',
+    '9': 'd__Bacteria; p__Firmicutes; c__Bacilli',
+    '11': 'd__Bacteria; p__Firmicutes; c__Bacilli',
+}
+facc_species_tid_dict = {
+    'A16379.1.1485': ('[Haemophilus] ducreyi', '3'),
+    'AB000001.1.1400': ('Sulfolobus sp.', '7'),
+    'AB000002.5.1300': ('Bacillus subtilis', '9'),
+    'AB000003.1.1500': ('Bacillus cereus', '9'),
+    'AB000004.1.1450': ('Bacillus cereus', '11'),
+}
+
+
+@pytest.fixture(params=[False, True], ids=['no_species', 'species'])
+def taxonomy_files(request, tmp_path):
+    tsv_file = str(tmp_path / 'taxonomy.tsv')
+    store_file = str(tmp_path / 'taxonomy.db')
+    with open(tsv_file, 'w') as tsv_fh:
+        write_tax_strings(facc_species_tid_dict, prop_dict, tsv_fh,
+                          sp_label=request.param)
+    write_taxonomy_store(iter_tax_strings(facc_species_tid_dict, prop_dict,
+                                          sp_label=request.param),
+                         prop_dict, store_file)
+    return tsv_file, store_file
+
+
+def test_store_matches_taxonomy_dict(taxonomy_files):
+    tsv_file, store_file = taxonomy_files
+    assert is_taxonomy_store(store_file)
+    assert not is_taxonomy_store(tsv_file)
+    with open(tsv_file) as tsv_fh:
+        tax_dict = make_taxonomy_dict(tsv_fh)
+
+    store = TaxonomyStore(store_file)
+    for accession, lineage in tax_dict.items():
+        assert accession in store
+        assert store[accession] == lineage
+        assert store.get_lineage(accession) == lineage
+        assert store.get_taxid(accession) == \
+               facc_species_tid_dict[accession][1]
+    assert store.get_all_lineages() == tax_dict
+    assert store.get_lineages(list(tax_dict) + ['missing']) == tax_dict
+    for taxid, lineage in prop_dict.items():
+        assert store.get_taxid_lineage(taxid) == lineage
+
+    assert 'missing' not in store
+    with pytest.raises(KeyError):
+        store['missing']
+    assert store.get_lineage('missing') is None
+    assert store.get_taxid('missing', 'none') == 'none'
+    assert store.get_taxid_lineage('missing') is None
+    store.close()
+
+
+def test_filter_with_store_matches_taxonomy_dict(taxonomy_files, tmp_path):
+    tsv_file, store_file = taxonomy_files
+    fasta_file = str(tmp_path / 'input.fasta')
+    with open(fasta_file, 'w') as fasta_fh:
+        for i, accession in enumerate(sorted(facc_species_tid_dict)):
+            fasta_fh.write('>%s\n%s\n' % (accession, 'ACGT' * (i + 1)))
+    groups = '{"d__Bacteria":12, "d__Archaea":4}'
+
+    with open(tsv_file) as tsv_fh:
+        tax_dict = make_taxonomy_dict(tsv_fh)
+    reader = LazyFastaReader(fasta_file)
+    expected = io.StringIO()
+    filter_seqs_by_len_and_tax(reader, expected, eval(groups), tax_dict,
+                               global_length_min=100)
+    reader.close()
+
+    output_file = str(tmp_path / 'output.fasta')
+    result = subprocess.run(
+        [sys.executable,
+         os.path.join(scripts_dir, 'filter_seqs_by_length_and_taxonomy.py'),
+         '-i', fasta_file, '-t', store_file, '-o', output_file,
+         '-g', groups, '-m', '100'], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    with open(output_file) as output_fh:
+        assert output_fh.read() == expected.getvalue()
+    assert expected.getvalue().count('>') == 4